@@ -4,6 +4,7 @@
 # Requires: python-docx  (and docx2pdf for PDF on Windows + MS Word)
 
 from io import BytesIO
+from copy import deepcopy
 from datetime import datetime
 import os
 import tempfile
@@ -13,6 +14,9 @@ from docx import Document
 from docx.shared import Pt, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT, WD_CELL_VERTICAL_ALIGNMENT
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, nsmap
+from lxml import etree
 from docx.oxml.shared import OxmlElement, qn
 
 # Optional PDF (Windows + MS Word installed)
@@ -23,7 +27,7 @@ except Exception:
     DOCX2PDF_AVAILABLE = False
 
 from scheduler_logic import (
-    init_db, list_practicals_by, get_batches, list_batch_members,
+    init_db, list_practicals_by, get_batches, list_batch_members_bulk,
     get_students_for_practical, list_assigned_reg_nos_for_practical
 )
 
@@ -35,30 +39,112 @@ init_db()
 # Example: TEMPLATE_PATH = r"F:\GPTC_Practical_Timetable\app\templates\sign_sheet.docx"
 TEMPLATE_PATH = None
 
+# Cell margins (twips) for the timetable and signature tables
+CELL_MARGINS = {"top": "80", "start": "90", "bottom": "80", "end": "90"}
+SIG_CELL_MARGINS = {"top": "120", "start": "120", "bottom": "120", "end": "120"}
+
+# (align, bold) per timetable column for body rows; all body text is 10 pt
+BODY_ROW_STYLES = (("C", False), ("C", False), ("C", False), ("L", False), ("C", False))
+
 # ---------- Helpers ----------
-def _fmt_ampm(hhmm: str) -> str:
-    try:
-        return pd.to_datetime(hhmm, format="%H:%M").strftime("%I:%M %p").lstrip("0")
-    except Exception:
-        return hhmm
+def _fmt_ampm_col(hhmm: pd.Series) -> pd.Series:
+    """Vectorized "HH:MM" -> "h:MM AM/PM"; unparseable values are kept as-is."""
+    out = pd.to_datetime(hhmm, format="%H:%M", errors="coerce").dt.strftime("%I:%M %p").str.lstrip("0")
+    return out.fillna(hhmm)
+
+_ROMANS = ("","I","II","III","IV","V","VI","VII","VIII","IX","X","XI","XII")
 
 def _roman(n: int) -> str:
-    ROMANS = ["","I","II","III","IV","V","VI","VII","VIII","IX","X","XI","XII"]
-    return ROMANS[n] if 0 <= n < len(ROMANS) else str(n)
+    return _ROMANS[n] if 0 <= n < len(_ROMANS) else str(n)
 
-def _cell_set_margins(cell, **margins_twips):
-    tc = cell._tc
-    tcPr = tc.get_or_add_tcPr()
-    # remove existing margins to avoid duplicates
-    for el in tcPr.findall(qn('w:tcMar')):
-        tcPr.remove(el)
+_TWO_DIGIT = tuple(f"{i:02d}" for i in range(100))
+
+def _two_digit(n: int) -> str:
+    """Zero-padded count text ("07"); table lookup for the usual 0..99 range."""
+    return _TWO_DIGIT[n] if 0 <= n < len(_TWO_DIGIT) else f"{n:02d}"
+
+# w:tcMar elements built once per margin set, then copied into each cell
+_MARGIN_CACHE: dict[tuple, OxmlElement] = {}
+
+def _build_tcMar(margins_twips: dict):
     tcMar = OxmlElement('w:tcMar')
     for k, v in margins_twips.items():
         node = OxmlElement(f'w:{k}')
         node.set(qn('w:w'), str(v))   # twips
         node.set(qn('w:type'), 'dxa')
         tcMar.append(node)
-    tcPr.append(tcMar)
+    return tcMar
+
+def _cell_set_margins(cell, **margins_twips):
+    # cells are always freshly added here, so there is no prior w:tcMar to remove
+    key = tuple(sorted(margins_twips.items()))
+    tmpl = _MARGIN_CACHE.get(key)
+    if tmpl is None:
+        tmpl = _MARGIN_CACHE[key] = _build_tcMar(margins_twips)
+    cell._tc.get_or_add_tcPr().append(deepcopy(tmpl))
+
+# Parsed <w:tr> templates keyed by (column widths, styles, size); rows are deep copies
+# of these with only the <w:t> text filled in.
+_ROW_TEMPLATES: dict[tuple, etree._Element] = {}
+_JC = {"L": "left", "C": "center", "R": "right"}
+_CELL_TEXT = etree.XPath(".//w:t", namespaces={"w": nsmap["w"]})
+
+def _row_template(widths_twips: tuple, styles: tuple, size: int = 10):
+    key = (widths_twips, styles, size)
+    tmpl = _ROW_TEMPLATES.get(key)
+    if tmpl is None:
+        mar = "".join(f'<w:{k} w:w="{v}" w:type="dxa"/>' for k, v in CELL_MARGINS.items())
+        cells = []
+        for w, (align, bold) in zip(widths_twips, styles):
+            b = "<w:b/>" if bold else '<w:b w:val="0"/>'
+            cells.append(
+                f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{w}"/><w:vAlign w:val="center"/>'
+                f'<w:tcMar>{mar}</w:tcMar></w:tcPr>'
+                f'<w:p><w:pPr><w:jc w:val="{_JC.get(align, "left")}"/></w:pPr>'
+                f'<w:r><w:rPr>{b}<w:sz w:val="{size * 2}"/></w:rPr>'
+                '<w:t xml:space="preserve"/></w:r></w:p></w:tc>'
+            )
+        xml = f'<w:tr {nsdecls("w")}>' + "".join(cells) + "</w:tr>"
+        tmpl = _ROW_TEMPLATES[key] = parse_xml(xml)
+    return tmpl
+
+def _make_row(values, widths_twips: tuple, styles: tuple):
+    """Build a complete <w:tr> (widths, margins, text) without going through python-docx cells."""
+    row = deepcopy(_row_template(widths_twips, styles))
+    for t, v in zip(_CELL_TEXT(row), values):
+        t.text = str(v)
+    return row
+
+# Base document (page setup + Normal font) serialized once; keyed by template path and mtime
+_BASE_DOCX_CACHE: dict[tuple, bytes] = {}
+
+def _base_docx_bytes() -> bytes:
+    if TEMPLATE_PATH and os.path.exists(TEMPLATE_PATH):
+        key = (TEMPLATE_PATH, os.path.getmtime(TEMPLATE_PATH))
+    else:
+        key = (None, None)
+    data = _BASE_DOCX_CACHE.get(key)
+    if data is None:
+        # Document (optionally based on TEMPLATE_PATH)
+        doc = Document(TEMPLATE_PATH) if key[0] else Document()
+        # A4 & margins
+        section = doc.sections[0]
+        section.page_height = Cm(29.7)
+        section.page_width = Cm(21.0)
+        section.left_margin = Cm(2.54)
+        section.right_margin = Cm(2.54)
+        section.top_margin = Cm(2.54)
+        section.bottom_margin = Cm(2.54)
+
+        # Default font
+        style = doc.styles['Normal']
+        style.font.name = 'Times New Roman'
+        style.font.size = Pt(11)
+
+        bio = BytesIO()
+        doc.save(bio)
+        data = _BASE_DOCX_CACHE[key] = bio.getvalue()
+    return data
 
 def _para(doc, text, bold=False, size=12, align="L", after_pt=2):
     p = doc.add_paragraph()
@@ -110,13 +196,15 @@ def build_subject_docx_bytes(practical_code: str, header_overrides: dict | None
 
     # Gather batches & members
     batches = get_batches(practical_code).sort_values(["date", "start_time"]).reset_index(drop=True)
+    batches["start_fmt"] = _fmt_ampm_col(batches["start_time"])
+    batches["end_fmt"] = _fmt_ampm_col(batches["end_time"])
 
     # Build date line: single date or range
-    if batches.empty:
+    dates = batches["date"].dropna()
+    if dates.empty:
         date_line_auto = ""
     else:
-        dates = batches["date"].dropna().tolist()
-        dmin, dmax = min(dates), max(dates)
+        dmin, dmax = dates.min(), dates.max()
         date_line_auto = dmin if dmin == dmax else f"{dmin} to {dmax}"
 
     # Header fields
@@ -129,24 +217,8 @@ def build_subject_docx_bytes(practical_code: str, header_overrides: dict | None
     year_sem = header_overrides.get("year_sem") or year_sem_default
     date_line = header_overrides.get("date_line") or date_line_auto
 
-    # Document (optionally based on TEMPLATE_PATH)
-    if TEMPLATE_PATH and os.path.exists(TEMPLATE_PATH):
-        doc = Document(TEMPLATE_PATH)
-    else:
-        doc = Document()
-    # A4 & margins
-    section = doc.sections[0]
-    section.page_height = Cm(29.7)
-    section.page_width = Cm(21.0)
-    section.left_margin = Cm(2.54)
-    section.right_margin = Cm(2.54)
-    section.top_margin = Cm(2.54)
-    section.bottom_margin = Cm(2.54)
-
-    # Default font
-    style = doc.styles['Normal']
-    style.font.name = 'Times New Roman'
-    style.font.size = Pt(11)
+    # Document: A4, margins and default font come from the cached base
+    doc = Document(BytesIO(_base_docx_bytes()))
 
     # Top headings
     _para(doc, session_title, bold=True, size=14, align="C", after_pt=2)
@@ -188,31 +260,27 @@ def build_subject_docx_bytes(practical_code: str, header_overrides: dict | None
     headers = ["S.NO", "BATCH NO", "DATE & TIME", "REG.NO OF STUDENTS", "TOTAL NO OF STUDENTS"]
     for i, t in enumerate(headers):
         _apply_cell_text(hdr[i], t, align="C", size=10, bold=True, valign="M")
-        _cell_set_margins(hdr[i], top="80", start="90", bottom="80", end="90")
-
-    # Body rows
+        _cell_set_margins(hdr[i], **CELL_MARGINS)
+
+    # Body rows (built directly as XML; margins and widths are baked into the row template)
+    body_widths = tuple(w.twips for w in col_widths)
+    # one query for all batch members instead of one per batch
+    members = list_batch_members_bulk(batches["batch_id"].astype(int).tolist())
+    # reg_no is already str in the bulk result, so the cell text is a plain join per batch
+    reg_text_by_batch = {bid: ", ".join(m["reg_no"]) for bid, m in members.items()}
+    count_by_batch = {bid: len(m) for bid, m in members.items()}
     sn = 1
     grand_total = 0
-    for _, b in batches.iterrows():
-        batch_id = int(b["batch_id"])
-        mem = list_batch_members(batch_id, detailed=True)
-        reg_list = mem["reg_no"].tolist() if not mem.empty else []
-        reg_text = ", ".join(str(x) for x in reg_list)
-
-        row_cells = table.add_row().cells
-        for i, w in enumerate(col_widths):
-            row_cells[i].width = w
-
-        _apply_cell_text(row_cells[0], str(sn), align="C", size=10)
-        _apply_cell_text(row_cells[1], _roman(int(b["batch_no"])), align="C", size=10)
-        dt = f"{b['date']} & {_fmt_ampm(b['start_time'])} – {_fmt_ampm(b['end_time'])}"
-        _apply_cell_text(row_cells[2], dt, align="C", size=10)
-        _apply_cell_text(row_cells[3], reg_text, align="L", size=10)
-        cnt = len(reg_list)
-        _apply_cell_text(row_cells[4], f"{cnt:02d}", align="C", size=10)
-
-        for c in row_cells:
-            _cell_set_margins(c, top="80", start="90", bottom="80", end="90")
+    for b in batches.itertuples(index=False):
+        batch_id = int(b.batch_id)
+        reg_text = reg_text_by_batch.get(batch_id, "")
+        cnt = count_by_batch.get(batch_id, 0)
+
+        dt = f"{b.date} & {b.start_fmt} – {b.end_fmt}"
+        table._tbl.append(_make_row(
+            [str(sn), _roman(int(b.batch_no)), dt, reg_text, _two_digit(cnt)],
+            body_widths, BODY_ROW_STYLES,
+        ))
 
         grand_total += cnt
         sn += 1
@@ -225,9 +293,9 @@ def build_subject_docx_bytes(practical_code: str, header_overrides: dict | None
     _apply_cell_text(tot_row[1], "", align="C", size=10)
     _apply_cell_text(tot_row[2], "TOTAL", align="C", size=10, bold=True)
     _apply_cell_text(tot_row[3], "", align="L", size=10)
-    _apply_cell_text(tot_row[4], f"{grand_total:02d}", align="C", size=10, bold=True)
+    _apply_cell_text(tot_row[4], _two_digit(grand_total), align="C", size=10, bold=True)
     for c in tot_row:
-        _cell_set_margins(c, top="80", start="90", bottom="80", end="90")
+        _cell_set_margins(c, **CELL_MARGINS)
 
      # Signature row
     # Add 3 blank lines before the signature table
@@ -246,7 +314,7 @@ def build_subject_docx_bytes(practical_code: str, header_overrides: dict | None
     _apply_cell_text(row_sig.cells[2], "CHIEF SUPERINTENDENT", align="C", size=10, bold=True)
 
     for cell in row_sig.cells:
-        _cell_set_margins(cell, top="120", start="120", bottom="120", end="120")
+        _cell_set_margins(cell, **SIG_CELL_MARGINS)
 
 
     # Output bytes
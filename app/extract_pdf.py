@@ -6,14 +6,26 @@
 
 import re
 import os
+import gc
+import csv
 import sys
 import json
 import argparse
-from collections import Counter
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from itertools import chain
 from datetime import datetime
 
 import pdfplumber
-import pandas as pd
+
+# Optional: PDFium text engine (faster than pdfplumber for plain text; opt-in, see USE_PDFIUM)
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except Exception:
+    PDFIUM_AVAILABLE = False
 
 # --- ensure stdout uses utf-8 on Windows consoles ---
 try:
@@ -31,6 +43,37 @@ SETTINGS_DIR = os.path.join(PROJECT_ROOT, "settings")
 os.makedirs(EXTRACTED_DIR, exist_ok=True)
 os.makedirs(INPUT_DIR, exist_ok=True)
 
+# Text engine: pdfplumber by default. EXTRACT_PDF_ENGINE=pdfium opts into PDFium, which is
+# faster but returns text in content-stream order without layout sorting, so tables drawn
+# column by column come out unparseable.
+USE_PDFIUM = PDFIUM_AVAILABLE and os.environ.get("EXTRACT_PDF_ENGINE", "").lower() == "pdfium"
+
+# Force a garbage collection after this many pages to keep memory flat on large PDFs
+GC_EVERY_PAGES = 50
+
+# With more than one worker (the CLI default is MAX_WORKERS), page parsing is spread over
+# worker processes for PDFs with at least PARALLEL_MIN_PAGES pages; smaller files are parsed
+# inline (pool start-up costs more). Library callers such as the Streamlit app stay serial.
+# ProcessPoolExecutor rejects more than 61 workers on Windows, so the pool size is capped there.
+POOL_WORKER_LIMIT = 61
+MAX_WORKERS = min(os.cpu_count() or 1, POOL_WORKER_LIMIT)
+PARALLEL_MIN_PAGES = 16
+PAGE_CHUNKSIZE = 4
+
+# Without --verbose, page progress is printed once every this many pages
+PROGRESS_EVERY_PAGES = 50
+
+# Stop scanning a student table after this many consecutive unparseable lines
+# (footer / signature text that follows the table).
+MAX_STUDENT_LINE_MISSES = 3
+
+# Write buffer for the output CSVs (StudentSubjectMap.csv grows row by row while pages are parsed)
+CSV_WRITE_BUFFER = 1 << 20
+
+# Output CSV columns
+PM_COLS = ["ins_code","ncno","dept_name","sub_code","subject_name","type","col_no","total_candidates","practical_code","exam_month_year"]
+SSM_COLS = ["reg_no","student_name","dob","regl","sem","ncno","dept_name","sub_code","subject_name","type","col_no","practical_code","ins_code"]
+
 # ------------------ Embedded department map (fallback) ------------------
 # This is used when settings/dept_codes.json is not present.
 # Modify / extend this mapping if your NCNO codes differ.
@@ -44,6 +87,30 @@ DEPT_MAP = {
   "1066": "GARMENT TECHNOLOGY",
 }
 
+# ------------------ Compiled patterns ------------------
+# Compiled once at import; the row/header patterns run on every line of every page.
+# Checklist text is ASCII, so every pattern uses re.ASCII (\d, \s, \b and case-insensitive
+# matching then skip the Unicode tables).
+_INS_CODE_RE = re.compile(r"Ins\s*Code\s*Name\s*of\s*the\s*Institution\s*\n+(\d{2,4})\s+([^\n]+)", re.IGNORECASE | re.ASCII)
+_INS_CODE_ALT_RE = re.compile(r"\bIns(?:titution)?\s*Code.*?\n+(\d{2,4})\b", re.IGNORECASE | re.ASCII)
+_INST_LINE_RE = re.compile(r"(\d{2,4}\s*,?\s*GOVERNMENT\s+POLYTECHNIC\s+COLLEGE[^\n]*)", re.IGNORECASE | re.ASCII)
+_LEADING_CODE_RE = re.compile(r"^\s*(\d{2,4})\b", re.ASCII)
+# title/header patterns are written in upper case and run on upper-cased text
+# (folded once with str.upper instead of IGNORECASE folding per character)
+_SUMMARY_PAGE_RE = re.compile(r"PRACTICAL\s+CHECK\s+LIST\s*\(SUMMARY\)", re.ASCII)
+_SUBJECT_PAGE_RE = re.compile(r"PRACTICAL\s+CHECK\s+LIST\s*::", re.ASCII)
+_SUMMARY_HEADER_RE = re.compile(r"\bSNO\b.*\bNCNO\b.*\bSUBCODE\b.*\bTYPE\b.*\bNOC\b", re.ASCII)
+_SUBJECT_HEADER_RE = re.compile(r"(\d{2,4}-\d{3,4}-[A-Z0-9\-]+)\s+(.+?)\s+(P|PT|ASC)\s*$", re.ASCII)
+_STUDENT_HEADER_RE = re.compile(r"S\.?NO\s+NCNO\s+REG\s*NO\s+NAME.*DOB\s+REGL\s+SEM\s+COL", re.ASCII)
+_MONTH_YEAR_RE = re.compile(
+    r"(JANUARY|FEBRUARY|MARCH|APRIL|MAY|JUNE|JULY|AUGUST|SEPTEMBER|OCTOBER|NOVEMBER|DECEMBER)\s+(\d{4})",
+    re.IGNORECASE | re.ASCII,
+)
+
+# Summary-row field checks (plain set/str tests; no regex per field)
+_SUBCODE_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-")
+_PRACTICAL_TYPES = frozenset({"P", "PT", "ASC"})
+
 # ------------------ Helper functions ------------------
 def load_dept_map():
     """
@@ -103,22 +170,22 @@ def parse_institution(text):
     ins_code = None
     institute_line = None
 
-    m = re.search(r"Ins\s*Code\s*Name\s*of\s*the\s*Institution\s*\n+(\d{2,4})\s+([^\n]+)", text, flags=re.IGNORECASE)
+    m = _INS_CODE_RE.search(text)
     if m:
         ins_code = m.group(1).strip()
         institute_line = m.group(2).strip()
 
     if not ins_code:
-        m = re.search(r"\bIns(?:titution)?\s*Code.*?\n+(\d{2,4})\b", text, flags=re.IGNORECASE)
+        m = _INS_CODE_ALT_RE.search(text)
         if m:
             ins_code = m.group(1).strip()
 
     if not institute_line:
-        m2 = re.search(r"(\d{2,4}\s*,?\s*GOVERNMENT\s+POLYTECHNIC\s+COLLEGE[^\n]*)", text, flags=re.IGNORECASE)
+        m2 = _INST_LINE_RE.search(text)
         if m2:
             institute_line = m2.group(1).strip()
             if not ins_code:
-                mcode = re.search(r"^\s*(\d{2,4})\b", institute_line)
+                mcode = _LEADING_CODE_RE.search(institute_line)
                 if mcode:
                     ins_code = mcode.group(1).strip()
 
@@ -134,27 +201,33 @@ def parse_institution(text):
     return ins_code, institute_line, header_text
 
 def detect_page_kind(text):
-    if re.search(r"PRACTICAL\s+CHECK\s+LIST\s*\(SUMMARY\)", text, flags=re.IGNORECASE):
+    # literal prefilters: each title regex needs these substrings, so most pages
+    # are classified without running the other pattern
+    text_upper = text.upper()
+    if "PRACTICAL" not in text_upper:
+        return None
+    if "(SUMMARY)" in text_upper and _SUMMARY_PAGE_RE.search(text_upper):
         return "summary"
-    if re.search(r"PRACTICAL\s+CHECK\s+LIST\s*::", text, flags=re.IGNORECASE):
+    if "::" in text and _SUBJECT_PAGE_RE.search(text_upper):
         return "subject"
     return None
 
 def extract_summary_rows(text):
     rows = []
     started = False
-    for raw_line in text.splitlines():
+    for raw_line in text.split("\n"):
         line = raw_line.strip()
         if not line:
             continue
 
-        if re.search(r"\bSNo\b.*\bNCNO\b.*\bSubCode\b.*\bType\b.*\bNoC\b", line, flags=re.IGNORECASE):
+        line_upper = line.upper()
+        if "NOC" in line_upper and _SUMMARY_HEADER_RE.search(line_upper):
             started = True
             continue
         if not started:
             continue
 
-        parts = re.split(r"\s{1,}", line)
+        parts = line.split()
         if len(parts) < 6:
             continue
 
@@ -166,16 +239,14 @@ def extract_summary_rows(text):
             noc = parts[-1].strip()
             subject_name = " ".join(parts[3:-2]).strip()
 
-            if not re.fullmatch(r"\d+", s_no):
+            if not s_no.isdecimal():
                 continue
-            if not re.fullmatch(r"\d{3,4}", ncno):
-                # allow variations but still capture
-                pass
-            if not re.fullmatch(r"[A-Z0-9\-]+", sub_code):
+            # ncno is not validated: allow variations but still capture
+            if not _SUBCODE_CHARS.issuperset(sub_code):
                 continue
-            if not re.fullmatch(r"(P|PT|ASC)", maybe_type):
+            if maybe_type not in _PRACTICAL_TYPES:
                 continue
-            if not re.fullmatch(r"\d+", noc):
+            if not noc.isdecimal():
                 continue
 
             rows.append({
@@ -194,9 +265,12 @@ def extract_subject_header(text):
     practical_code = None
     subject_name = None
     ptype = None
-    for line in text.splitlines():
+    for line in text.split("\n"):
         line = line.strip()
-        m = re.match(r"(\d{2,4}-\d{3,4}-[A-Z0-9\-]+)\s+(.+?)\s+(P|PT|ASC)\s*$", line)
+        # the code "123-1020-4020470" must lead the line; skip the regex otherwise
+        if not (line[:1].isdigit() and "-" in line):
+            continue
+        m = _SUBJECT_HEADER_RE.match(line)
         if m:
             practical_code = m.group(1)
             subject_name = m.group(2).strip()
@@ -205,111 +279,255 @@ def extract_subject_header(text):
     return practical_code, subject_name, ptype
 
 def extract_student_rows(text):
+    """
+    Parse the student table of a subject page. Rows are tuples
+    (s_no, ncno, reg_no, student_name, dob, regl, sem, col_no) — lighter than
+    dicts to build and to send back from the page workers.
+    """
     rows = []
-    started = False
-    header_seen = False
+    misses = 0
+    lines = text.split("\n")
 
-    header_pattern = re.compile(r"S\.?No\s+NCNO\s+Reg\s*No\s+Name.*DoB\s+Regl\s+Sem\s+Col", re.IGNORECASE)
-    line_pattern = re.compile(
-        r"^\s*(\d+)\s+(\d{3,4})\s+(\d+)\s+(.+?)\s+(\d{2}\.\d{2}\.\d{4})\s+([A-Z0-9]+)\s+(\d+)\s+(\d+)\s*$"
-    )
+    # locate the table header; rows start on the line after it
+    start = None
+    for i, raw_line in enumerate(lines):
+        line = raw_line.strip()
+        line_upper = line.upper()
+        if "NCNO" in line_upper and not line.startswith("Page No:") and _STUDENT_HEADER_RE.search(line_upper):
+            start = i + 1
+            break
+    if start is None:
+        return rows
 
-    for raw_line in text.splitlines():
+    for raw_line in lines[start:]:
         line = raw_line.strip()
         if not line:
-            if started:
-                break
-            continue
+            break
         if line.startswith("Page No:"):
             continue
-        if not header_seen and header_pattern.search(line):
-            header_seen = True
-            started = True
-            continue
-        if started:
-            m = line_pattern.match(line)
-            if m:
-                try:
-                    rows.append({
-                        "s_no": int(m.group(1)),
-                        "ncno": m.group(2),
-                        "reg_no": m.group(3),
-                        "student_name": m.group(4).strip(),
-                        "dob": m.group(5),
-                        "regl": m.group(6),
-                        "sem": int(m.group(7)),
-                        "col_no": int(m.group(8)),
-                    })
-                except Exception:
-                    pass
-            else:
-                parts = re.split(r"\s{1,}", line)
-                if len(parts) >= 8:
-                    try:
-                        s_no = int(parts[0])
-                        ncno = parts[1]
-                        reg_no = parts[2]
-                        dob = parts[-4]
-                        regl = parts[-3]
-                        sem = int(parts[-2])
-                        col_no = int(parts[-1])
-                        name = " ".join(parts[3:-4]).strip()
-                        rows.append({
-                            "s_no": s_no,
-                            "ncno": ncno,
-                            "reg_no": reg_no,
-                            "student_name": name,
-                            "dob": dob,
-                            "regl": regl,
-                            "sem": sem,
-                            "col_no": col_no,
-                        })
-                    except Exception:
-                        pass
+        n_rows = len(rows)
+        # fixed-field row: S.No NCNO RegNo <name...> DoB Regl Sem Col
+        # (right fields peeled with rsplit, left with split; the name is everything in between)
+        parts = line.rsplit(None, 4)
+        left = parts[0].split(None, 3) if len(parts) == 5 else ()
+        if len(left) == 4:
+            try:
+                rows.append((
+                    int(left[0]),
+                    left[1],
+                    left[2],
+                    " ".join(left[3].split()),
+                    parts[1],
+                    parts[2],
+                    int(parts[3]),
+                    int(parts[4]),
+                ))
+            except ValueError:
+                pass
+        if len(rows) > n_rows:
+            misses = 0
+        else:
+            misses += 1
+            if misses >= MAX_STUDENT_LINE_MISSES:
+                break
     return rows
 
 def month_year_from_text(text):
-    m = re.search(r"(JANUARY|FEBRUARY|MARCH|APRIL|MAY|JUNE|JULY|AUGUST|SEPTEMBER|OCTOBER|NOVEMBER|DECEMBER)\s+(\d{4})",
-                  text, flags=re.IGNORECASE)
+    m = _MONTH_YEAR_RE.search(text)
     if m:
         return f"{m.group(1)[:3].upper()} {m.group(2)}"
     return datetime.now().strftime("%b %Y").upper()
 
+def _mode(values):
+    """Most common value in one counting pass (first seen wins ties); None if empty."""
+    counts = {}
+    for v in values:
+        counts[v] = counts.get(v, 0) + 1
+    return max(counts, key=counts.get) if counts else None
+
+def _open_pdf(pdf_path):
+    """Open the PDF with the selected text engine (see USE_PDFIUM)."""
+    return pdfium.PdfDocument(pdf_path) if USE_PDFIUM else pdfplumber.open(pdf_path)
+
+def _page_count(pdf):
+    return len(pdf) if USE_PDFIUM else len(pdf.pages)
+
+def _page_text(pdf, index):
+    """
+    Extract the text of page `index`, then release the page's native / cached
+    objects (PDFium text page, pdfplumber chars and text map) so they are not kept alive.
+    """
+    if USE_PDFIUM:
+        page = pdf[index]
+        textpage = page.get_textpage()
+        try:
+            text = textpage.get_text_bounded()
+        finally:
+            textpage.close()
+            page.close()
+        return text.replace("\r\n", "\n")  # PDFium separates lines with CRLF
+    page = pdf.pages[index]
+    text = page.extract_text() or ""
+    page.flush_cache()
+    if hasattr(page.get_textmap, "cache_clear"):
+        page.get_textmap.cache_clear()
+    return text
+
+def _iter_page_texts(pdf, start=0):
+    """Yield (page_no, text) for every page from index `start` onward."""
+    for index in range(start, _page_count(pdf)):
+        pno = index + 1
+        text = _page_text(pdf, index)
+        if pno % GC_EVERY_PAGES == 0:
+            gc.collect()
+        yield pno, text
+
+def parse_page(text):
+    """
+    Classify one page and parse its rows. Returns (kind, payload):
+      ("summary", summary_rows)
+      ("subject", (practical_code, subject_name, ptype, student_rows))
+      (None, None) for pages that match neither.
+    """
+    kind = detect_page_kind(text)
+    if kind == "summary":
+        return kind, extract_summary_rows(text)
+    if kind == "subject":
+        practical_code, subject_name, ptype = extract_subject_header(text)
+        stud_rows = extract_student_rows(text) if practical_code else []
+        return kind, (practical_code, subject_name, ptype, stud_rows)
+    return None, None
+
+# --- worker-process side of the page pool: each worker opens the PDF once ---
+_WORKER_PDF = None
+
+def _init_page_worker(pdf_path):
+    global _WORKER_PDF
+    _WORKER_PDF = _open_pdf(pdf_path)
+
+def _parse_page_at(index):
+    return parse_page(_page_text(_WORKER_PDF, index))
+
+def _parse_pages(pdf, pdf_path, start, workers):
+    """
+    Yield parse_page() results for pages from index `start` onward, in page order.
+    """
+    remaining = _page_count(pdf) - start
+    if workers <= 1 or remaining < PARALLEL_MIN_PAGES:
+        for _, text in _iter_page_texts(pdf, start):
+            yield parse_page(text)
+        return
+    done = start
+    ex = ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker,
+                             initargs=(pdf_path,))
+    try:
+        for result in ex.map(_parse_page_at, range(start, start + remaining), chunksize=PAGE_CHUNKSIZE):
+            yield result
+            done += 1
+    except BrokenProcessPool:
+        # workers could not start (e.g. host app not importable under spawn): finish inline
+        ex.shutdown(cancel_futures=True)
+        print("[WARN] Parallel page parsing unavailable — continuing serially.")
+        for _, text in _iter_page_texts(pdf, done):
+            yield parse_page(text)
+    except BaseException:
+        # parse error or the caller stopped early: drop queued pages instead of waiting for them
+        ex.shutdown(cancel_futures=True)
+        raise
+    else:
+        ex.shutdown()
+
+@contextmanager
+def _csv_writer(path, header):
+    """
+    Yield a csv.writer for a UTF-8 (BOM) CSV for Excel, header already written.
+    Rows go to a temporary file that replaces `path` only when the block completes.
+    The temp file is unique per call, so overlapping runs never share or delete each
+    other's partial output.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8-sig", buffering=CSV_WRITE_BUFFER) as f:
+            w = csv.writer(f, lineterminator=os.linesep)
+            w.writerow(header)
+            yield w
+        os.chmod(tmp_path, 0o644)  # mkstemp creates 0600; keep the CSVs readable like before
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _write_csv(path, header, rows):
+    """Write rows (sequences in header order) as a UTF-8 (BOM) CSV for Excel."""
+    with _csv_writer(path, header) as w:
+        w.writerows(rows)
+
 # ------------------ MAIN Extraction ------------------
-def extract_all(pdf_path):
+def _quiet(*args, **kwargs):
+    pass
+
+def extract_all(pdf_path, workers=None, verbose=False):
+    """
+    Parse the checklist PDF and write PracticalMaster.csv / StudentSubjectMap.csv.
+    workers: processes used for page parsing (default None = serial, in-process;
+             capped at POOL_WORKER_LIMIT). The CLI passes MAX_WORKERS.
+    verbose: print a line per page; otherwise only every PROGRESS_EVERY_PAGES pages.
+    """
+    if workers is None:
+        workers = 1
+    elif workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    workers = min(workers, POOL_WORKER_LIMIT)
+    page_log = print if verbose else _quiet
     dept_map = load_dept_map()  # normalized map
+    dept_cache = {}  # ncno -> resolved department (ncno_to_dept tries several fallbacks)
+
+    def dept_for(ncno):
+        dept_name = dept_cache.get(ncno)
+        if dept_name is None:
+            dept_name = dept_cache[ncno] = ncno_to_dept(ncno, dept_map)
+        return dept_name
+
     practical_master = {}
-    student_rows_all = []
+    ssm_count = 0
     unresolved_ncno_set = set()
 
     ins_code = None
     exam_month_year = None
 
-    with pdfplumber.open(pdf_path) as pdf:
-        total_pages = len(pdf.pages)
+    pm_path = os.path.join(EXTRACTED_DIR, "PracticalMaster.csv")
+    ssm_path = os.path.join(EXTRACTED_DIR, "StudentSubjectMap.csv")
+
+    # student rows are written out page by page instead of being collected first
+    with _open_pdf(pdf_path) as pdf, _csv_writer(ssm_path, SSM_COLS) as ssm_writer:
+        total_pages = _page_count(pdf)
         print(f"\n[INFO] Starting extraction from: {os.path.basename(pdf_path)}")
         print(f"[INFO] Total pages detected: {total_pages}\n")
 
-        for pno, page in enumerate(pdf.pages, start=1):
-            text = page.extract_text() or ""
-            print(f"[PAGE {pno}/{total_pages}] Reading... ", end="")
+        parsed_pages = iter(())
+        if total_pages:
+            # page 1 is parsed inline: it carries the institution code and exam month
+            first_text = _page_text(pdf, 0)
+            ins_code, _, _ = parse_institution(first_text)
+            exam_month_year = month_year_from_text(first_text)
+            parsed_pages = chain([parse_page(first_text)], _parse_pages(pdf, pdf_path, 1, workers))
 
-            if pno == 1:
-                ins_code, _, _ = parse_institution(text)
-                exam_month_year = month_year_from_text(text)
+        for pno, (kind, payload) in enumerate(parsed_pages, start=1):
+            page_log(f"[PAGE {pno}/{total_pages}] Reading... ", end="")
+            if not verbose and (pno % PROGRESS_EVERY_PAGES == 0 or pno == total_pages):
+                print(f"[INFO] Pages read: {pno}/{total_pages}")
 
-            kind = detect_page_kind(text)
             if kind == "summary":
-                print("Summary section found")
-                rows = extract_summary_rows(text)
-                for r in rows:
-                    ncno = str(r["ncno"]).strip()
+                page_log("Summary section found")
+                for r in payload:
+                    ncno = r["ncno"]  # already a stripped token
                     sub_code = r["sub_code"]
                     subject_name = r["subject_name"]
                     ptype = r["type"]
                     noc = r["noc"]
                     practical_code = f"{ins_code}-{ncno}-{sub_code}" if ins_code else f"{ncno}-{sub_code}"
-                    dept_name = ncno_to_dept(ncno, dept_map)
+                    dept_name = dept_for(ncno)
                     if dept_name == "UNKNOWN DEPARTMENT":
                         unresolved_ncno_set.add(ncno)
                     practical_master[practical_code] = {
@@ -326,46 +544,50 @@ def extract_all(pdf_path):
                     }
 
             elif kind == "subject":
-                practical_code, subject_name_pg, ptype_pg = extract_subject_header(text)
-                print(f"Subject section: {practical_code or 'Unknown'}")
+                practical_code, subject_name_pg, ptype_pg, stud_rows = payload
+                page_log(f"Subject section: {practical_code or 'Unknown'}")
                 if not practical_code:
                     continue
 
-                stud_rows = extract_student_rows(text)
-                print(f" {len(stud_rows)} students found")
+                page_log(f" {len(stud_rows)} students found")
+
+                # "<ins>-<ncno>-<sub>" split once per page (sub_code is the last segment)
+                code_parts = practical_code.split("-")
+                has_parts = len(code_parts) > 1
+                pc_ins = code_parts[0] if has_parts else (ins_code or "")
+                pc_sub = code_parts[-1]
 
-                col_no = None
-                if stud_rows:
-                    col_no = Counter([r["col_no"] for r in stud_rows]).most_common(1)[0][0]
+                col_no = _mode(r[-1] for r in stud_rows)  # most common col_no on the page
 
-                for s in stud_rows:
-                    ncno = str(s["ncno"]).strip()
-                    dept_name = ncno_to_dept(ncno, dept_map)
+                for _, ncno, reg_no, student_name, dob, regl, sem, s_col_no in stud_rows:
+                    dept_name = dept_for(ncno)
                     if dept_name == "UNKNOWN DEPARTMENT":
                         unresolved_ncno_set.add(ncno)
-                    student_rows_all.append({
-                        "reg_no": s["reg_no"],
-                        "student_name": s["student_name"],
-                        "dob": s["dob"],
-                        "regl": s["regl"],
-                        "sem": s["sem"],
-                        "ncno": ncno,
-                        "dept_name": dept_name,
-                        "sub_code": practical_code.split("-")[-1],
-                        "subject_name": subject_name_pg or "",
-                        "type": ptype_pg or "",
-                        "col_no": s["col_no"],
-                        "practical_code": practical_code,
-                        "ins_code": practical_code.split("-")[0] if "-" in practical_code else (ins_code or ""),
-                    })
+                    # columns in SSM_COLS order
+                    ssm_writer.writerow([
+                        reg_no,
+                        student_name,
+                        dob,
+                        regl,
+                        sem,
+                        ncno,
+                        dept_name,
+                        pc_sub,
+                        subject_name_pg or "",
+                        ptype_pg or "",
+                        s_col_no,
+                        practical_code,
+                        pc_ins,
+                    ])
+                ssm_count += len(stud_rows)
 
                 if practical_code not in practical_master:
-                    ncno_part = practical_code.split("-")[1] if "-" in practical_code else ""
+                    ncno_part = code_parts[1] if has_parts else ""
                     practical_master[practical_code] = {
-                        "ins_code": practical_code.split("-")[0] if "-" in practical_code else (ins_code or ""),
+                        "ins_code": pc_ins,
                         "ncno": ncno_part,
-                        "dept_name": ncno_to_dept(ncno_part, dept_map),
-                        "sub_code": practical_code.split("-")[-1],
+                        "dept_name": dept_for(ncno_part),
+                        "sub_code": pc_sub,
                         "subject_name": subject_name_pg or "",
                         "type": ptype_pg or "",
                         "col_no": col_no,
@@ -375,23 +597,15 @@ def extract_all(pdf_path):
                     }
 
             else:
-                print("Skipped (no match)")
-
-    pm_path = os.path.join(EXTRACTED_DIR, "PracticalMaster.csv")
-    ssm_path = os.path.join(EXTRACTED_DIR, "StudentSubjectMap.csv")
+                page_log("Skipped (no match)")
 
-    pm_cols = ["ins_code","ncno","dept_name","sub_code","subject_name","type","col_no","total_candidates","practical_code","exam_month_year"]
-    ssm_cols = ["reg_no","student_name","dob","regl","sem","ncno","dept_name","sub_code","subject_name","type","col_no","practical_code","ins_code"]
-
-    pm_df = pd.DataFrame([practical_master[k] for k in sorted(practical_master.keys())], columns=pm_cols)
-    ssm_df = pd.DataFrame(student_rows_all, columns=ssm_cols)
-
-    pm_df.to_csv(pm_path, index=False, encoding="utf-8-sig")
-    ssm_df.to_csv(ssm_path, index=False, encoding="utf-8-sig")
+    _write_csv(pm_path, PM_COLS,
+               ([practical_master[k][c] for c in PM_COLS] for k in sorted(practical_master)))
+    pm_count = len(practical_master)
 
     # Write extraction log
     with open(os.path.join(EXTRACTED_DIR, "extraction_log.txt"), "w", encoding="utf-8") as f:
-        f.write(f"Extracted {len(pm_df)} practical(s), {len(ssm_df)} student rows\n")
+        f.write(f"Extracted {pm_count} practical(s), {ssm_count} student rows\n")
         f.write(f"Exam: {exam_month_year}\n")
         f.write(f"PDF: {os.path.basename(pdf_path)}\n")
         if unresolved_ncno_set:
@@ -400,8 +614,8 @@ def extract_all(pdf_path):
                 f.write(f"{uc}\n")
 
     print("\n[SUMMARY]")
-    print(f"  Total practicals extracted : {len(pm_df)}")
-    print(f"  Total student rows         : {len(ssm_df)}")
+    print(f"  Total practicals extracted : {pm_count}")
+    print(f"  Total student rows         : {ssm_count}")
     print(f"  Exam Month/Year            : {exam_month_year}")
     print(f"\n[OK] Wrote: {pm_path}")
     print(f"[OK] Wrote: {ssm_path}")
@@ -412,22 +626,33 @@ def extract_all(pdf_path):
     print("\n✅ Extraction complete.\n")
 
 def find_default_pdf():
+    """First PDF file in INPUT_DIR (stops at the first hit), or None."""
     if not os.path.isdir(INPUT_DIR):
         return None
-    pdfs = [os.path.join(INPUT_DIR, x) for x in os.listdir(INPUT_DIR) if x.lower().endswith(".pdf")]
-    return pdfs[0] if pdfs else None
+    with os.scandir(INPUT_DIR) as it:
+        for entry in it:
+            if entry.name.lower().endswith(".pdf") and entry.is_file():
+                return entry.path
+    return None
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--input", "-i", help="Path to the DOTE Practical Checklist PDF")
+    parser.add_argument("--workers", "-w", type=int, default=None,
+                        help="Worker processes for page parsing (default: CPU count, at most 61; 1 = serial)")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                        help="Print a line for every page")
     args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
 
     pdf_path = args.input or find_default_pdf()
     if not pdf_path or not os.path.exists(pdf_path):
         print("ERROR: No input PDF found. Put your file in data/input_pdf/ or pass --input path.")
         sys.exit(1)
 
-    extract_all(pdf_path)
+    workers = MAX_WORKERS if args.workers is None else args.workers
+    extract_all(pdf_path, workers=workers, verbose=args.verbose)
 
 if __name__ == "__main__":
     main()
@@ -572,6 +572,30 @@ def list_batch_members(batch_id, detailed=False):
     members["reg_no"] = members["reg_no"].astype(str)
     return members.merge(ssm.drop_duplicates("reg_no"), on="reg_no", how="left")
 
+def list_batch_members_bulk(batch_ids):
+    """
+    Fetch members of several batches in one query.
+    Returns dict batch_id -> DataFrame with a single reg_no column, like
+    list_batch_members(detailed=False) except that reg_no is always cast to str.
+    Batches without members are absent from the dict.
+    """
+    result = {}
+    if not batch_ids:
+        return result
+    init_db()
+    conn = _connect()
+    placeholders = ",".join(["?"] * len(batch_ids))
+    q = f"""SELECT batch_id, reg_no FROM BatchMembers
+            WHERE batch_id IN ({placeholders}) ORDER BY batch_id, reg_no"""
+    members = pd.read_sql_query(q, conn, params=[int(b) for b in batch_ids])
+    conn.close()
+    if members.empty:
+        return result
+    members["reg_no"] = members["reg_no"].astype(str)
+    for bid, grp in members.groupby("batch_id", sort=False):
+        result[int(bid)] = grp.drop(columns="batch_id").reset_index(drop=True)
+    return result
+
 def remove_student_from_batch(batch_id, reg_no):
     init_db()
     conn = _connect()